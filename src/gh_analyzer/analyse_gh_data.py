@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import csv
+import gc
 import json
 import logging  # Import the logging module
+import sys
+from collections import defaultdict
 from datetime import datetime
+from operator import itemgetter
 import xlsxwriter
+try:
+    import ijson
+except ImportError:  # fall back to loading the whole file at once
+    ijson = None
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 def read_json_file(filename: str) -> dict:
     """
@@ -18,549 +31,451 @@ def read_json_file(filename: str) -> dict:
     Returns:
         dict: The dictionary read from the JSON file.
     """
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    return data
+    if orjson is None:
+        with open(filename, 'r') as f:
+            return json.load(f)
 
+    with open(filename, 'rb') as f:
+        return orjson.loads(f.read())
 
-def get_reduced_alert(alert) -> dict:
+
+def iter_json_items(filename: str):
     """
-    Extracts and returns a reduced dictionary of relevant information from a given alert.
+    Iterates over the elements of a top-level JSON array without loading the whole file.
 
     Parameters:
-        alert (dict): The original alert dictionary containing detailed information.
-
-    Returns:
-        dict: A reduced dictionary containing key information about the alert.
-    """
-    alert_rec = {}
-    alert_rec["number"] = alert["number"]
-    alert_rec["state"] = alert["state"]
-    alert_rec["created_at"] = alert["created_at"]
-    alert_rec["updated_at"] = alert["updated_at"]
-    alert_rec["package"] = alert["dependency"]["package"]["name"]
-    alert_rec["ecosystem"] = alert["dependency"]["package"]["ecosystem"]
-    alert_rec["scope"] = alert["dependency"]["scope"]
-    alert_rec["ghsa_id"] = alert["security_advisory"]["ghsa_id"]
-    alert_rec["severity"] = alert["security_vulnerability"]["severity"]
-    if "repository" in alert:   # only in organisation alerts
-        alert_rec["repository-url"] = alert["repository"]["url"]
-    else:
-        alert_rec["repository-url"] = alert["url"]
-
-    return alert_rec
-    
+        filename (str): The path to the JSON file.
 
-def get_reduced_org_alerts() -> dict:
+    Yields:
+        The elements of the array, one at a time.
     """
-    Reads organization dependency alerts from a JSON file, reduces the information to key details,
-    and organizes them by repository.
+    if ijson is None:
+        yield from read_json_file(filename)
+        return
 
-    Returns:
-        dict: A dictionary where the keys are repository full names and the values are lists of reduced alert dictionaries.
-    """
+    with open(filename, 'rb') as f:
+        yield from ijson.items(f, "item")
 
-    gh_org_alerts = read_json_file("gh_org_dep_alerts.json")
-    logging.info(f"read {len(gh_org_alerts)} org alerts")
-    reduced_org_alerts = {}
-    for alert in gh_org_alerts:
 
-        repo_identifier = alert["repository"]["full_name"]
-        alert_rec = get_reduced_alert(alert)
-        alert_rec["repository-full_name"] = repo_identifier
+def iter_json_kvitems(filename: str):
+    """
+    Iterates over the key/value pairs of a top-level JSON object without loading the whole file.
 
-        repo_container = []
-        if(repo_identifier in reduced_org_alerts):
-            repo_container = reduced_org_alerts[repo_identifier]
-        else:
-            reduced_org_alerts[repo_identifier] = repo_container
+    Parameters:
+        filename (str): The path to the JSON file.
 
-        repo_container.append(alert_rec)
+    Yields:
+        tuple: The (key, value) pairs of the object, one at a time.
+    """
+    if ijson is None:
+        yield from read_json_file(filename).items()
+        return
 
-    return reduced_org_alerts
+    with open(filename, 'rb') as f:
+        yield from ijson.kvitems(f, "")
 
-def get_reduced_repo_data() -> dict:
-    """
-    Reads repository data from a JSON file, reduces the information to key details,
-    and organizes them by repository identifier.
 
-    Returns:
-        dict: A dictionary where the keys are repository identifiers and the values are reduced repository data dictionaries.
+def parse_gh_timestamp(timestamp: str) -> datetime:
     """
+    Parses a GitHub API timestamp like "2024-01-31T12:34:56Z".
 
-    gh_repo_data = read_json_file("gh_repo_data.json")
-    logging.info(f"read {len(gh_repo_data)} repos")
+    datetime.fromisoformat is implemented in C and much cheaper than datetime.strptime,
+    the trailing "Z" is stripped as older Python versions do not accept it.
 
-    reduced_repo_data = {}
-    for repo_identifier in gh_repo_data:
-        
-        repo = gh_repo_data[repo_identifier]
-        repo_rec = {}
-        repo_rec["full_name"] = repo["full_name"]
-        repo_rec["archived"] = repo["archived"]
-        repo_rec["disabled"] = repo["disabled"]
-        repo_rec["private"] = repo["private"]
-        repo_rec["url"] = repo["url"]
-        repo_rec["languages"] = repo["languages"]
-        
-        dep_enabled = repo["dependabot_enabled"]
-        repo_rec["dependabot_enabled"] = dep_enabled
-       
-        repo_alert_container = []
-        if dep_enabled:
-            for alert in repo["dependabot_alerts"]:
-                alert_rec = get_reduced_alert(alert)
-                alert_rec["repository-full_name"] = repo_identifier
+    Parameters:
+        timestamp (str): The timestamp in ISO 8601 format with a trailing "Z".
 
-                repo_alert_container.append(alert_rec)
-        else:
-            # without dependabot no dependabot alerts
-            pass
+    Returns:
+        datetime: The parsed (naive, UTC) datetime.
+    """
+    return datetime.fromisoformat(timestamp[:-1])
 
-        repo_rec["dependabot_alerts"] = repo_alert_container
 
-        reduced_repo_data[repo_identifier] = repo_rec
-                
-    return reduced_repo_data
+# severity x state of an alert is encoded as one bucket number, severity * 3 + state,
+# which matches the dep_<severity>_<state> column order of the repository sheets
+ALERT_SEVERITY_CODES = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+ALERT_STATE_CODES = {"open": 0, "dismissed": 1, "fixed": 2}
+ALERT_BUCKET_COUNT = len(ALERT_SEVERITY_CODES) * len(ALERT_STATE_CODES)
 
 
-def create_repo_alerts_vs_org(org_alerts, repos_data):
+def get_alert_bucket(state: str, severity: str):
     """
-    Create a comparison of repository alerts versus organization alerts.
-
-    This function generates a CSV-like structure that compares the number of 
-    Dependabot alerts for each repository with the number of organization-wide 
-    alerts for the same repository.
+    Encodes the state and severity of an alert as a single bucket number.
 
     Parameters:
-        org_alerts (dict): A dictionary containing organization-wide alerts, 
-                           where the keys are repository identifiers and the 
-                           values are lists of alerts.
-        repos_data (dict): A dictionary containing repository data, where the 
-                           keys are repository identifiers and the values are 
-                           dictionaries with repository details.
+        state (str): The alert state, everything except "open" and "fixed" counts as dismissed.
+        severity (str): The alert severity.
 
     Returns:
-        list: A list of lists representing CSV rows. The first row is the header, 
-              and subsequent rows contain the comparison data for each repository.
+        int: The bucket number, or None for an unknown severity.
     """
+    severity_code = ALERT_SEVERITY_CODES.get(severity)
+    if severity_code is None:
+        return None
 
-    csv_header = [  "full_name", "archived", \
-                    "disabled", "private", "dep_enabled", \
-                    "repo_dep_alerts", "org_dep_alerts"
-                 ]
-    csv_records = []
-    csv_records.append(csv_header)
-    for repo_key in repos_data:
-        repo = repos_data[repo_key]
+    state_code = ALERT_STATE_CODES.get(state, ALERT_STATE_CODES["dismissed"])
+    return severity_code * len(ALERT_STATE_CODES) + state_code
 
-        logging.info(f"repo: {repo_key}")
 
-        repo_dep_enabled = repo["dependabot_enabled"]
-        repo_archived = repo["archived"]
-        repo_disabled = repo["disabled"]
-        repo_private = repo["private"]
+# top level fields copied as they are, fetched with a single itemgetter call
+REPO_FIELDS = ("full_name", "archived", "disabled", "private", "url", "languages", "dependabot_enabled")
+get_repo_fields = itemgetter(*REPO_FIELDS)
+get_alert_fields = itemgetter("number", "state", "created_at", "updated_at")
 
-        repo_alert_count = 0
-        if(repo["dependabot_alerts"]):
-            repo_alert_count =  len(repo["dependabot_alerts"])
 
-        org_alert_count = 0
-        if repo_key in org_alerts :
-            org_alert_count = len(org_alerts[repo_key])
-
-        csv_record = [  repo_key, repo_archived, \
-                        repo_disabled, repo_private, repo_dep_enabled, \
-                        repo_alert_count, org_alert_count
-                    ]
-        csv_records.append(csv_record)
-
-    return csv_records
+class AlertRec:
+    """
+    A reduced Dependabot alert holding only the fields used by the report.
 
+    The class uses __slots__, so every alert is stored as a flat record instead of a
+    dictionary with its own hash table.
+    """
 
-def get_exist_open_alerts(alerts) -> bool:
+    __slots__ = (   "number", "state", "created_at", "updated_at", \
+                    "package", "ecosystem", "scope", "ghsa_id", "severity", \
+                    "repository_url", "repository_full_name", "bucket"
+                )
+
+    def __init__(self, number, state, created_at, updated_at, package, ecosystem, scope, ghsa_id, severity,
+                 repository_url, repository_full_name=""):
+        self.number = number
+        self.state = state
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.package = package
+        self.ecosystem = ecosystem
+        self.scope = scope
+        self.ghsa_id = ghsa_id
+        self.severity = severity
+        self.repository_url = repository_url
+        self.repository_full_name = repository_full_name
+        self.bucket = get_alert_bucket(state, severity)
+
+
+def intern_value(value):
     """
-    Check if there are any open alerts in the given list of alerts.
+    Interns a string field of an alert, the GitHub API may return null instead.
 
     Parameters:
-        alerts (list): A list of alert dictionaries, where each dictionary 
-                       contains details about an alert, including its state.
+        value (str): The field value, or None.
 
     Returns:
-        bool: True if there is at least one open alert, False otherwise.
+        str: The interned string, or None if the value is None.
     """
-    for alert in alerts:
-        if "open" == alert["state"]:
-            return True
-
-    return False
+    return sys.intern(value) if value is not None else None
 
 
-def create_gh_overview(repos_data) -> list:
+def get_reduced_alert(alert, repository_full_name="") -> AlertRec:
     """
-    Generate an overview of GitHub repositories.
-
-    This function creates a CSV-like structure that provides an overview of 
-    various repository attributes such as the number of archived repositories, 
-    private repositories, repositories with Dependabot enabled, and repositories 
-    with Dependabot alerts.
+    Extracts and returns a reduced record of relevant information from a given alert.
 
     Parameters:
-        repos_data (dict): A dictionary containing repository data, where the 
-                           keys are repository identifiers and the values are 
-                           dictionaries with repository details.
+        alert (dict): The original alert dictionary containing detailed information.
+        repository_full_name (str): The full name of the repository the alert belongs to.
 
     Returns:
-        list: A list of lists representing CSV rows. The first row is the header, 
-              and subsequent rows contain the overview data for each repository.
+        AlertRec: A reduced record containing key information about the alert.
     """
+    if "repository" in alert:   # only in organisation alerts
+        repository_url = alert["repository"]["url"]
+    else:
+        repository_url = alert["url"]
+
+    # the few distinct values of these fields are interned, so all alerts share one
+    # string object per value and comparing against the literals is a pointer check
+    number, state, created_at, updated_at = get_alert_fields(alert)
+    dependency = alert["dependency"]
+    return AlertRec(
+        number=number,
+        state=intern_value(state),
+        created_at=created_at,
+        updated_at=updated_at,
+        package=dependency["package"]["name"],
+        ecosystem=intern_value(dependency["package"]["ecosystem"]),
+        scope=intern_value(dependency["scope"]),
+        ghsa_id=alert["security_advisory"]["ghsa_id"],
+        severity=intern_value(alert["security_vulnerability"]["severity"]),
+        repository_url=repository_url,
+        repository_full_name=repository_full_name,
+    )
+    
 
-    counter_number_of_repos = 0
-    counter_number_of_repos_archived = 0
-    counter_number_of_repos_private = 0
-    counter_number_of_repos_dependabot_enabled = 0
-    counter_number_of_repos_dependabot_alerts = 0
-    counter_number_of_repos_dependabot_alerts_open = 0
-
-    csv_header = ["What", "Case", "Value"]
-    csv_records = []
-    csv_records.append(csv_header)
-    for repo_key in repos_data:
-        repo = repos_data[repo_key]
+def reduce_org_alerts(alerts) -> dict:
+    """
+    Reduces organization dependency alerts to key details and organizes them by repository.
 
-        counter_number_of_repos += 1
+    Parameters:
+        alerts (iterable): The alert dictionaries as read from the organization alerts file.
 
-        repo_archived = repo["archived"]
+    Returns:
+        dict: A dictionary where the keys are repository full names and the values are lists of AlertRec records.
+    """
 
-        logging.info(f"repo: {repo_key} is archived: {repo_archived}")
+    alert_count = 0
+    reduced_org_alerts = defaultdict(list)
+    for alert in alerts:
+        alert_count += 1
 
-        if repo_archived:
-            counter_number_of_repos_archived += 1
+        repo_identifier = alert["repository"]["full_name"]
+        reduced_org_alerts[repo_identifier].append(get_reduced_alert(alert, repo_identifier))
 
-        elif not repo_archived:
+    logger.info(f"read {alert_count} org alerts")
+    return reduced_org_alerts
 
-            repo_private = repo["private"]
-            if repo_private:
-                counter_number_of_repos_private += 1
-        
-            dep_enabled = repo["dependabot_enabled"]
-            if dep_enabled:
-                counter_number_of_repos_dependabot_enabled += 1
+def reduce_repo_data(repos) -> dict:
+    """
+    Reduces repository data to key details and organizes them by repository identifier.
 
-            if(repo["dependabot_alerts"]):
-                repo_alert_count = len(repo["dependabot_alerts"])
-                if repo_alert_count > 0:
-                    counter_number_of_repos_dependabot_alerts += 1
+    Parameters:
+        repos (iterable): (repository identifier, repository dictionary) tuples as read from the repository data file.
 
-                if get_exist_open_alerts(repo["dependabot_alerts"]):
-                    counter_number_of_repos_dependabot_alerts_open += 1
-        else:
-            logging.error(f"Unknown Archived State: {repo_archived}")
+    Returns:
+        dict: A dictionary where the keys are repository identifiers and the values are reduced repository data dictionaries.
+    """
 
-    csv_record = ["repositories","number of all", counter_number_of_repos]
-    csv_records.append(csv_record)
+    reduced_repo_data = {}
+    for repo_identifier, repo in repos:
 
-    csv_record = ["repositories","number of archived", counter_number_of_repos_archived]
-    csv_records.append(csv_record)
+        repo_rec = dict(zip(REPO_FIELDS, get_repo_fields(repo)))
+        dep_enabled = repo_rec["dependabot_enabled"]
 
-    counter_number_of_repos_active = counter_number_of_repos - counter_number_of_repos_archived
-    csv_record = ["repositories","number of active", counter_number_of_repos_active]
-    csv_records.append(csv_record)
+        # without dependabot no dependabot alerts
+        repo_alert_container = []
+        if dep_enabled:
+            repo_alert_container = [get_reduced_alert(alert, repo_identifier) for alert in repo["dependabot_alerts"]]
 
-    csv_record = ["repositories","number of private", counter_number_of_repos_private]
-    csv_records.append(csv_record)
+        repo_rec["dependabot_alerts"] = repo_alert_container
 
-    counter_number_of_repos_public = counter_number_of_repos_active - counter_number_of_repos_private
-    csv_record = ["repositories","number of public", counter_number_of_repos_public]
-    csv_records.append(csv_record)
+        reduced_repo_data[repo_identifier] = repo_rec
 
-    csv_record = ["repositories","number of enabled dependabot", counter_number_of_repos_dependabot_enabled]
-    csv_records.append(csv_record)
+    logger.info(f"read {len(reduced_repo_data)} repos")
+    return reduced_repo_data
 
-    csv_record = ["repositories","number of repos with dependabot alerts", counter_number_of_repos_dependabot_alerts]
-    csv_records.append(csv_record)
+def load_and_reduce(filename: str, is_org: bool) -> dict:
+    """
+    Streams an input file and reduces its records while they are read.
 
-    csv_record = ["repositories","number of repos with open dependabot alerts", counter_number_of_repos_dependabot_alerts_open]
-    csv_records.append(csv_record)
+    The cyclic garbage collector is paused meanwhile: the reduction allocates a lot of
+    short-lived objects, which would otherwise trigger many useless collections.
 
-    return csv_records
+    Parameters:
+        filename (str): The path to the JSON file.
+        is_org (bool): True for the organization alerts file (a list of alerts),
+                       False for the repository data file (an object keyed by repository).
 
+    Returns:
+        dict: The reduced data, see reduce_org_alerts and reduce_repo_data.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if is_org:
+            return reduce_org_alerts(iter_json_items(filename))
+        return reduce_repo_data(iter_json_kvitems(filename))
+    finally:
+        if gc_enabled:
+            gc.enable()
 
-def create_gh_repo_short_overview(repos_data) -> list:
+def get_reduced_org_alerts() -> dict:
     """
-    Generate an short overview of GitHub repositories.
+    Reads organization dependency alerts from a JSON file, reduces the information to key details,
+    and organizes them by repository.
 
-    This function creates a CSV-like structure that provides an overview of 
-    various repository attributes such as the number of archived repositories, 
-    private repositories, repositories with Dependabot enabled, and repositories 
-    with Dependabot alerts.
+    Returns:
+        dict: A dictionary where the keys are repository full names and the values are lists of AlertRec records.
+    """
+    return load_and_reduce("gh_org_dep_alerts.json", is_org=True)
 
-    Parameters:
-        repos_data (dict): A dictionary containing repository data, where the 
-                           keys are repository identifiers and the values are 
-                           dictionaries with repository details.
+def get_reduced_repo_data() -> dict:
+    """
+    Reads repository data from a JSON file, reduces the information to key details,
+    and organizes them by repository identifier.
 
     Returns:
-        list: A list of lists representing CSV rows. The first row is the header, 
-              and subsequent rows contain the overview data for each repository.
+        dict: A dictionary where the keys are repository identifiers and the values are reduced repository data dictionaries.
     """
+    return load_and_reduce("gh_repo_data.json", is_org=False)
 
-    csv_header = [  "repo", "private", "dependabot", \
-                    "dep_cri_open", "dep_cri_dismissed", "dep_cri_fixed", \
-                    "dep_hig_open", "dep_hig_dismissed", "dep_hig_fixed"
-                ]
-    csv_records = []
-    csv_records.append(csv_header)
-
-    for repo_key in repos_data:
-        repo = repos_data[repo_key]
 
-        repo_archived = repo["archived"]
-        logging.info(f"repo: {repo_key} is archived: {repo_archived}")
-        if repo_archived:
-            continue
+SHEET_TITLES = ["Overview", "ARepos", "AReposShort", "CompareOrgVsRepo", "Languages", "LanguageSummary"]
 
-        repo_private = repo["private"]
-        repo_dep_enabled = repo["dependabot_enabled"]
 
-        counter_dep_critical_open = 0
-        counter_dep_critical_dismissed = 0
-        counter_dep_critical_fixed = 0
-        counter_dep_high_open = 0
-        counter_dep_high_dismissed = 0
-        counter_dep_high_fixed = 0
+def iter_sheet_rows(repos_data, org_alerts):
+    """
+    Generate the rows of all report sheets in a single pass over the repositories.
 
-        alerts = repo["dependabot_alerts"]
-        for alert in alerts:
-            state = alert["state"]
-            severity = alert["severity"]
-        
-            if "open" == state:
-                if "critical" == severity:
-                    counter_dep_critical_open +=1
-                elif "high" == severity:
-                    counter_dep_high_open += 1
-                else:
-                    pass
-
-            elif "fixed" == state:
-                
-                if "critical" == severity:
-                    counter_dep_critical_fixed +=1
-                elif "high" == severity:
-                    counter_dep_high_fixed += 1
-                else:
-                    pass
-            
-            else: #dismissed
-                if "critical" == severity:
-                    counter_dep_critical_dismissed +=1
-                elif "high" == severity:
-                    counter_dep_high_dismissed += 1
-                else:
-                    pass
-
-        csv_record = [  repo_key, repo_private, repo_dep_enabled, \
-                        counter_dep_critical_open, counter_dep_critical_dismissed, counter_dep_critical_fixed, \
-                        counter_dep_high_open, counter_dep_high_dismissed, counter_dep_high_fixed
-                     ]
-        csv_records.append(csv_record)
-
-    return csv_records
-
-
-def create_gh_repo_overview(repos_data) -> list:
-    """
-    Generate an overview of GitHub repositories.
-
-    This function creates a CSV-like structure that provides an overview of 
-    various repository attributes such as the number of archived repositories, 
-    private repositories, repositories with Dependabot enabled, and repositories 
-    with Dependabot alerts.
+    The repositories are walked once and the Dependabot alerts of every active
+    repository are walked once, producing the rows of the repository tables, the
+    comparison with the organization alerts and the language tables as they are
+    computed. The header of every sheet comes first, the overview and the language
+    summary rows, which need the totals, come last.
 
     Parameters:
         repos_data (dict): A dictionary containing repository data, where the 
                            keys are repository identifiers and the values are 
                            dictionaries with repository details.
+        org_alerts (dict): A dictionary containing organization-wide alerts, 
+                           where the keys are repository identifiers and the 
+                           values are lists of alerts.
 
-    Returns:
-        list: A list of lists representing CSV rows. The first row is the header, 
-              and subsequent rows contain the overview data for each repository.
+    Yields:
+        tuple: The sheet title (see SHEET_TITLES) and a list representing one CSV row of that sheet.
     """
 
-    csv_header = [  "full_name", "private", "dependabot", \
-                    "dep_cri_open", "dep_cri_dismissed", "dep_cri_fixed", \
-                    "dep_hig_open", "dep_hig_dismissed", "dep_hig_fixed", \
-                    "dep_med_open", "dep_med_dismissed", "dep_med_fixed", \
-                    "dep_low_open", "dep_low_dismissed", "dep_low_fixed", \
-                    "open_cri_max", "open_cri_avg", "open_hig_max", "open_hig_avg"
-                ]
-    csv_records = []
-    csv_records.append(csv_header)
+    counter_number_of_repos = 0
+    counter_number_of_repos_archived = 0
+    counter_number_of_repos_private = 0
+    counter_number_of_repos_dependabot_enabled = 0
+    counter_number_of_repos_dependabot_alerts = 0
+    counter_number_of_repos_dependabot_alerts_open = 0
+
+    yield "Overview", ["What", "Case", "Value"]
+    yield "ARepos", [   "full_name", "private", "dependabot", \
+                        "dep_cri_open", "dep_cri_dismissed", "dep_cri_fixed", \
+                        "dep_hig_open", "dep_hig_dismissed", "dep_hig_fixed", \
+                        "dep_med_open", "dep_med_dismissed", "dep_med_fixed", \
+                        "dep_low_open", "dep_low_dismissed", "dep_low_fixed", \
+                        "open_cri_max", "open_cri_avg", "open_hig_max", "open_hig_avg"
+                    ]
+    yield "AReposShort", [  "repo", "private", "dependabot", \
+                            "dep_cri_open", "dep_cri_dismissed", "dep_cri_fixed", \
+                            "dep_hig_open", "dep_hig_dismissed", "dep_hig_fixed"
+                         ]
+    yield "CompareOrgVsRepo", [ "full_name", "archived", \
+                                "disabled", "private", "dep_enabled", \
+                                "repo_dep_alerts", "org_dep_alerts"
+                              ]
+    yield "Languages", ["full_name", "language"]
+    yield "LanguageSummary", ["language", "repo_count"]
+
+    language_counters = defaultdict(int)
+    now = datetime.utcnow()
+    # bound to locals, they are looked up for every alert
+    parse_timestamp = parse_gh_timestamp
 
     for repo_key in repos_data:
         repo = repos_data[repo_key]
 
+        # per repo messages are debug only and formatted lazily, they are on the hot path
+        logger.debug("repo: %s archived: %s", repo_key, repo["archived"])
+
         repo_archived = repo["archived"]
+        repo_disabled = repo["disabled"]
+        repo_private = repo["private"]
+        repo_dep_enabled = repo["dependabot_enabled"]
+        alerts = repo["dependabot_alerts"]
+
+        # comparison with the organization alerts covers archived repos as well
+        repo_alert_count = len(alerts)
+        repo_org_alerts = org_alerts.get(repo_key)
+        org_alert_count = len(repo_org_alerts) if repo_org_alerts else 0
 
-        logging.info(f"repo: {repo_key} is archived: {repo_archived}")
+        yield "CompareOrgVsRepo", [ repo_key, repo_archived, \
+                                    repo_disabled, repo_private, repo_dep_enabled, \
+                                    repo_alert_count, org_alert_count
+                                  ]
+
+        counter_number_of_repos += 1
 
         if repo_archived:
+            counter_number_of_repos_archived += 1
             continue
 
-        repo_private = repo["private"]
-        repo_dep_enabled = repo["dependabot_enabled"]
+        if repo_private:
+            counter_number_of_repos_private += 1
+
+        if repo_dep_enabled:
+            counter_number_of_repos_dependabot_enabled += 1
+
+        if repo_alert_count > 0:
+            counter_number_of_repos_dependabot_alerts += 1
 
-        counter_dep_critical_open = 0
-        counter_dep_critical_dismissed = 0
-        counter_dep_critical_fixed = 0
-        counter_dep_high_open = 0
-        counter_dep_high_dismissed = 0
-        counter_dep_high_fixed = 0
-        counter_dep_medium_open = 0
-        counter_dep_medium_dismissed = 0
-        counter_dep_medium_fixed = 0
-        counter_dep_low_open = 0
-        counter_dep_low_dismissed = 0
-        counter_dep_low_fixed = 0
+        # one counter per (severity, state) bucket, in the column order of the sheets
+        bucket_counters = [0] * ALERT_BUCKET_COUNT
         days_open_critical = []
         days_open_high = []
+        append_days_open_critical = days_open_critical.append
+        append_days_open_high = days_open_high.append
+        has_open_alert = False
 
-        alerts = repo["dependabot_alerts"]
         for alert in alerts:
-            state = alert["state"]
-            created_time = alert["created_at"]
-            updated_time = alert["updated_at"]
-            severity = alert["severity"]
-        
-            created_datetime = datetime.strptime(created_time, "%Y-%m-%dT%H:%M:%SZ")
-            updated_datetime = datetime.strptime(updated_time, "%Y-%m-%dT%H:%M:%SZ")
+            state = alert.state
+            severity = alert.severity
+            bucket = alert.bucket
+
+            if bucket is not None:
+                bucket_counters[bucket] += 1
 
             if "open" == state:
-                updated_datetime = datetime.utcnow()
-                if "critical" == severity:
-                    counter_dep_critical_open +=1
-                elif "high" == severity:
-                    counter_dep_high_open += 1
-                elif "medium" == severity:
-                    counter_dep_medium_open += 1
-                elif "low" == severity:
-                    counter_dep_low_open += 1
-                else:
-                    pass
-
-            elif "fixed" == state:
-                
-                if "critical" == severity:
-                    counter_dep_critical_fixed +=1
-                elif "high" == severity:
-                    counter_dep_high_fixed += 1
-                elif "medium" == severity:
-                    counter_dep_medium_fixed += 1
-                elif "low" == severity:
-                    counter_dep_low_fixed += 1
-                else:
-                    pass
-            
-            else: #dismissed
-                if "critical" == severity:
-                    counter_dep_critical_dismissed +=1
-                elif "high" == severity:
-                    counter_dep_high_dismissed += 1
-                elif "medium" == severity:
-                    counter_dep_medium_dismissed += 1
-                elif "low" == severity:
-                    counter_dep_low_dismissed += 1
-                else:
-                    pass
+                has_open_alert = True
 
-            time_diff = updated_datetime - created_datetime
-            days_open = round(time_diff.days, 2)
             if "critical" == severity:
-                days_open_critical.append(days_open)
+                append_days_open = append_days_open_critical
             elif "high" == severity:
-                days_open_high.append(days_open)
-
-        days_critical = get_max_and_avg_time(days_open_critical)
-        days_high = get_max_and_avg_time(days_open_high)
+                append_days_open = append_days_open_high
+            else:
+                # days open are only reported for critical and high alerts
+                continue
 
-        csv_record = [  repo_key, repo_private, repo_dep_enabled, \
-                        counter_dep_critical_open, counter_dep_critical_dismissed, counter_dep_critical_fixed, \
-                        counter_dep_high_open, counter_dep_high_dismissed, counter_dep_high_fixed, \
-                        counter_dep_medium_open, counter_dep_medium_dismissed, counter_dep_medium_fixed, \
-                        counter_dep_low_open, counter_dep_low_dismissed, counter_dep_low_fixed, \
-                        days_critical["max"], days_critical["avg"], days_high["max"], days_high["avg"],
-                     ]
-        csv_records.append(csv_record)
-
-    return csv_records
+            # open alerts count until now, their updated_at is not needed
+            if "open" == state:
+                updated_datetime = now
+            else:
+                updated_datetime = parse_timestamp(alert.updated_at)
+            created_datetime = parse_timestamp(alert.created_at)
 
-def create_gh_languages_overview(repos_data) -> list:
+            time_diff = updated_datetime - created_datetime
+            append_days_open(round(time_diff.days, 2))
 
-    csv_header = [  "full_name", "language" ]
-    csv_records = []
-    csv_records.append(csv_header)
+        if has_open_alert:
+            counter_number_of_repos_dependabot_alerts_open += 1
 
-    for repo_key in repos_data:
-        repo = repos_data[repo_key]
+        days_critical = get_max_and_avg_time(days_open_critical)
+        days_high = get_max_and_avg_time(days_open_high)
 
-        repo_archived = repo["archived"]
-        logging.info(f"repo: {repo_key} is archived: {repo_archived}")
-        if repo_archived:
-            continue
+        yield "ARepos", [repo_key, repo_private, repo_dep_enabled] \
+                        + bucket_counters \
+                        + [days_critical["max"], days_critical["avg"], days_high["max"], days_high["avg"]]
 
-        languages = repo["languages"]
-        for language in languages:
-            csv_record = [repo_key, language]
-            csv_records.append(csv_record)
+        # critical and high buckets only
+        yield "AReposShort", [repo_key, repo_private, repo_dep_enabled] + bucket_counters[:6]
 
-    return csv_records
+        for language in repo["languages"]:
+            yield "Languages", [repo_key, language]
 
-def create_gh_languages_summary(repos_data) -> list:
+            language_counters[language] += 1
 
-    csv_header = [  "language", "repo_count" ]
-    csv_records = []
-    csv_records.append(csv_header)
+    counter_number_of_repos_active = counter_number_of_repos - counter_number_of_repos_archived
+    counter_number_of_repos_public = counter_number_of_repos_active - counter_number_of_repos_private
+    logger.info(f"{counter_number_of_repos_archived} of {counter_number_of_repos} repos are archived and skipped in the repository sheets")
+    yield "Overview", ["repositories","number of all", counter_number_of_repos]
+    yield "Overview", ["repositories","number of archived", counter_number_of_repos_archived]
+    yield "Overview", ["repositories","number of active", counter_number_of_repos_active]
+    yield "Overview", ["repositories","number of private", counter_number_of_repos_private]
+    yield "Overview", ["repositories","number of public", counter_number_of_repos_public]
+    yield "Overview", ["repositories","number of enabled dependabot", counter_number_of_repos_dependabot_enabled]
+    yield "Overview", ["repositories","number of repos with dependabot alerts", counter_number_of_repos_dependabot_alerts]
+    yield "Overview", ["repositories","number of repos with open dependabot alerts", counter_number_of_repos_dependabot_alerts_open]
 
-    language_counters = {}
-    for repo_key in repos_data:
-        repo = repos_data[repo_key]
+    for language in language_counters:
+        yield "LanguageSummary", [language, language_counters[language]]
 
-        repo_archived = repo["archived"]
-        logging.info(f"repo: {repo_key} is archived: {repo_archived}")
-        if repo_archived:
-            continue
 
-        languages = repo["languages"]
-        for language in languages:
-            language_counter = 0
-            if language in language_counters:
-                language_counter = language_counters[language]
-            
-            language_counter += 1
-            language_counters[language] = language_counter
+def get_max_and_avg_time(time_list) -> dict:
+    """
+    Get the maximum and the average of a list of durations.
 
-    for language in language_counters:
-        csv_record = [language, language_counters[language]]
-        csv_records.append(csv_record)
+    Parameters:
+        time_list (list): A list of durations in days.
 
-    return csv_records
+    Returns:
+        dict: A dictionary with the keys "max" and "avg", both 0 for an empty list.
+    """
+    if not time_list:
+        return {"max": 0, "avg": 0}
 
-def get_max_and_avg_time( time_list ) -> dict():
-    
-    item_max = 0
-    item_sum = 0
-    for item in time_list:
-        item_sum += item
-        if item > item_max:
-            item_max = item
-
-    if len(time_list) > 0:
-        item_avg = item_sum / len(time_list)
-    else:
-        item_avg = 0
- 
-    return {"max": item_max, "avg": item_avg}
+    # max and sum loop in C; the maximum never drops below 0 as in the report before
+    return {"max": max(0, max(time_list)), "avg": sum(time_list) / len(time_list)}
 
 def write_csv_file(output_file, csv_data):
     """
@@ -568,7 +483,8 @@ def write_csv_file(output_file, csv_data):
 
     Parameters:
     output_file (str): The path to the output CSV file.
-    csv_data (list of list of str): The CSV data to write, where each inner list represents a row.
+    csv_data (iterable of list of str): The CSV data to write, where each inner list represents a row.
+                                        Generators are written row by row without being materialized.
 
     Returns:
     None
@@ -577,20 +493,38 @@ def write_csv_file(output_file, csv_data):
         csv_writer = csv.writer(csvfile)
         csv_writer.writerows(csv_data)
 
-    logging.info(f"CSV data written to {output_file}")
+    logger.info(f"CSV data written to {output_file}")
+
+def add_work_sheets(workbook, sheet_rows, header_format):
+    """
+    Add all report sheets to the workbook and write the rows as they are generated.
 
-def add_work_sheet(workbook, title, data, header_format):
+    The rows of different sheets may be interleaved, but the rows of each sheet must
+    come in order, which also allows the workbook to be opened in constant_memory mode.
 
-    worksheet = workbook.add_worksheet(title)
-    worksheet.freeze_panes(1, 0)
+    Parameters:
+    workbook (xlsxwriter.Workbook): The workbook to add the sheets to.
+    sheet_rows (iterable): (sheet title, row) tuples as generated by iter_sheet_rows.
+    header_format (xlsxwriter.format.Format): The format of the first row of every sheet.
 
-    row = 0
-    for record in data:
+    Returns:
+    None
+    """
+    worksheets = {}
+    next_rows = {}
+    for title in SHEET_TITLES:
+        worksheet = workbook.add_worksheet(title)
+        worksheet.freeze_panes(1, 0)
+        worksheets[title] = worksheet
+        next_rows[title] = 0
+
+    for title, record in sheet_rows:
+        row = next_rows[title]
         if(row == 0):
-            worksheet.write_row(row, 0, record, header_format)
+            worksheets[title].write_row(row, 0, record, header_format)
         else:
-            worksheet.write_row(row, 0, record)
-        row += 1
+            worksheets[title].write_row(row, 0, record)
+        next_rows[title] = row + 1
 
     return
 
@@ -600,7 +534,8 @@ def main():
     redu_repo_data = get_reduced_repo_data()
 
     fileName = "gh_report.xlsx" 
-    workbook = xlsxwriter.Workbook(fileName)
+    # rows are streamed into the sheets, so they don't need to be kept in memory
+    workbook = xlsxwriter.Workbook(fileName, {"constant_memory": True})
     header_format = workbook.add_format(
         {
             "bold": True,
@@ -611,23 +546,7 @@ def main():
         }
     )
 
-    csv_data = create_gh_overview(redu_repo_data)        
-    add_work_sheet(workbook, "Overview", csv_data, header_format)
-
-    csv_data = create_gh_repo_overview(redu_repo_data)    
-    add_work_sheet(workbook, "ARepos", csv_data, header_format)
-
-    csv_data = create_gh_repo_short_overview(redu_repo_data)    
-    add_work_sheet(workbook, "AReposShort", csv_data, header_format)
-
-    csv_data = create_repo_alerts_vs_org(redu_org_alert, redu_repo_data)
-    add_work_sheet(workbook, "CompareOrgVsRepo", csv_data, header_format)
-
-    csv_data = create_gh_languages_overview(redu_repo_data)
-    add_work_sheet(workbook, "Languages", csv_data, header_format)
-
-    csv_data = create_gh_languages_summary(redu_repo_data)
-    add_work_sheet(workbook, "LanguageSummary", csv_data, header_format)
+    add_work_sheets(workbook, iter_sheet_rows(redu_repo_data, redu_org_alert), header_format)
 
     # Close the workbook
     workbook.close()
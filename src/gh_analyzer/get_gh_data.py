@@ -1,14 +1,118 @@
 import argparse
+import hashlib
 import json
 import logging  # Import the logging module
 import os
+import queue
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Number of pages of one paginated result fetched in parallel
+MAX_PAGE_WORKERS = 8
+
+# One repository record per line, written while the repositories are fetched
+REPO_RECORDS_FILE = "gh_repo_records.jsonl"
+
+# Number of times a rate limited request is retried before the response is returned
+MAX_RATE_LIMIT_RETRIES = 6
+
+# Directory of the ETag cache of API responses, an empty string disables the cache
+CACHE_DIR = ".gh_cache"
+
+# Directories created by make_dirs
+_created_dirs = set()
+
+GH_API_URL = "https://api.github.com"
+GRAPHQL_URL = f"{GH_API_URL}/graphql"
+# Number of repositories fetched with a single GraphQL request
+GRAPHQL_BATCH_SIZE = 50
+GRAPHQL_REPO_BUNDLE_FRAGMENT = """
+fragment RepoBundle on Repository {
+    hasVulnerabilityAlertsEnabled
+    vulnerabilityAlerts(first: 100) {
+        pageInfo { hasNextPage }
+        nodes {
+            number
+            state
+            createdAt
+            fixedAt
+            dismissedAt
+            autoDismissedAt
+            dependencyScope
+            securityAdvisory { ghsaId }
+            securityVulnerability {
+                severity
+                package { name ecosystem }
+            }
+        }
+    }
+    languages(first: 100) { nodes { name } }
+}
+"""
+# GraphQL severities which are named differently in the REST API
+GRAPHQL_SEVERITIES = {"MODERATE": "medium"}
+
+
+def dump_json_bytes(data) -> bytes:
+    """
+    Serializes data to compact JSON.
+
+    Parameters:
+        data: The data to serialize.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document, serialized with orjson when available.
+    """
+    if orjson is None:
+        return json.dumps(data, separators=(',', ':')).encode()
+    return orjson.dumps(data)
+
+
+def make_dirs(dir_path: str) -> None:
+    """
+    Creates a directory and its parents, unless this process created it already.
+
+    Parameters:
+        dir_path (str): The path of the directory, nothing is done for an empty path.
+
+    Returns:
+        None
+    """
+    if dir_path and dir_path not in _created_dirs:
+        os.makedirs(dir_path, exist_ok=True)  # may race with other fetch threads
+        _created_dirs.add(dir_path)
+
+
+def load_json_bytes(data: bytes):
+    """
+    Deserializes a JSON document.
+
+    Parameters:
+        data (bytes): The UTF-8 encoded JSON document.
+
+    Returns:
+        The decoded data, deserialized with orjson when available.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
 
 def write_json_to_file(data: dict, filename: str) -> None:
     """
@@ -21,122 +125,401 @@ def write_json_to_file(data: dict, filename: str) -> None:
     Returns:
         None
     """
-    dir_path, file_name = os.path.split(filename)
-    if dir_path and not os.path.exists(dir_path):
-        os.makedirs(dir_path)
+    make_dirs(os.path.dirname(filename))
 
-    if os.path.exists(file_name):
-        logging.info(f"File {file_name} already exists and will be overwritten.")
-    else:
-        logging.info(f"File {file_name} does not exist and will be created.")
+    # compact output serialized in one go and written through a large buffer,
+    # pretty printing doubled the size and json.dump issues many small writes
+    with open(filename, 'wb', buffering=1 << 20) as f:
+        f.write(dump_json_bytes(data))
 
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
+    logging.info(f"Data written to {filename}")
+
+
+def write_json_items_to_file(items, filename: str) -> int:
+    """
+    (Over)Writes the items of an iterable to a file as a JSON array.
+
+    The items are serialized and written one by one, so the iterable is never held
+    in memory as a whole. They are written aside and renamed once the iterable is
+    exhausted, so an error while iterating leaves the previous file intact.
+
+    Parameters:
+        items (Iterable): The items to write to the file.
+        filename (str): The name of the file to write the data to.
+
+    Returns:
+        int: The number of written items.
+    """
+    make_dirs(os.path.dirname(filename))
+
+    count = 0
+    tmp_file = f"{filename}.{os.getpid()}"
+    try:
+        with open(tmp_file, 'wb', buffering=1 << 20) as f:
+            f.write(b'[')
+            for count, item in enumerate(items, start=1):
+                if count > 1:
+                    f.write(b',')
+                f.write(dump_json_bytes(item))
+            f.write(b']')
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    os.replace(tmp_file, filename)
 
     logging.info(f"Data written to {filename}")
+    return count
 
 
-def request_pagination(url, headers) -> list:
+def get_cache_file(url: str) -> str:
     """
-    Fetches paginated data from a given URL.
+    Returns the path of the ETag cache entry of a URL.
+
+    Parameters:
+        url (str): The requested URL.
+
+    Returns:
+        str: The path of the cache entry within CACHE_DIR.
+    """
+    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+
+class BackgroundWriter:
+    """
+    Writes records to a JSON lines file on a separate thread.
+
+    The caller only hands the records over to a bounded queue and continues, the
+    serialization and the disk I/O happen on the writer thread. The records must not be
+    modified after they are handed over. Use it as a context manager, leaving the
+    context waits until everything is written.
+    """
+
+    def __init__(self, filename: str, maxsize: int = 32):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(filename,), daemon=True)
+        self.thread.start()
+
+    def _run(self, filename: str) -> None:
+        try:
+            f = open(filename, 'wb', buffering=1 << 20)
+        except OSError as error:
+            f = None
+            self.error = error
+        # keep draining the queue after an error, so the producer never blocks
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            if self.error is None:
+                try:
+                    f.write(dump_json_bytes(record) + b'\n')
+                except Exception as error:
+                    self.error = error
+        if f is not None:
+            try:
+                f.close()
+            except OSError as error:
+                if self.error is None:
+                    self.error = error
+
+    def write(self, record) -> None:
+        self.queue.put(record)
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def request_json(url, session) -> tuple:
+    """
+    Fetches a JSON document from the GitHub API using the ETag cache.
+
+    A cached response is revalidated with If-None-Match; GitHub answers 304 Not Modified
+    for unchanged data, which does not count against the rate limit and carries no body.
+
+    Parameters:
+        url (str): The URL to fetch.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        tuple: The status code, the decoded JSON (None unless 200) and the parsed Link header.
+    """
+    cached = None
+    cache_file = get_cache_file(url) if CACHE_DIR else None
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, 'rb') as f:
+            cached = load_json_bytes(f.read())
+        request_headers = {"If-None-Match": cached["etag"]}
+    else:
+        request_headers = {}
+
+    response = session.get(url, headers=request_headers)
+    if response.status_code == 304 and cached:
+        return 200, cached["data"], cached["links"]
+    if response.status_code != 200:
+        return response.status_code, None, {}
+
+    data = load_json_bytes(response.content)
+    # parsed from the Link header on every access
+    links = response.links
+    etag = response.headers.get("ETag")
+    if cache_file and etag:
+        make_dirs(CACHE_DIR)
+        # write aside and rename, so concurrent readers never see a partial entry
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_file, 'wb') as f:
+            f.write(dump_json_bytes({"etag": etag, "links": links, "data": data}))
+        os.replace(tmp_file, cache_file)
+
+    return 200, data, links
+
+
+def get_page_url(url: str, page: int) -> str:
+    """
+    Returns the given URL with its page query parameter set to the given page.
+
+    Parameters:
+        url (str): A URL of a paginated GitHub API result.
+        page (int): The page number.
+
+    Returns:
+        str: The URL of the requested page.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query["page"] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def get_page_number(url: str) -> int:
+    """
+    Returns the page query parameter of a URL.
+
+    Parameters:
+        url (str): A URL of a paginated GitHub API result.
+
+    Returns:
+        int: The page number, or None if the URL has no numeric page parameter.
+    """
+    page = dict(parse_qsl(urlsplit(url).query)).get("page")
+    return int(page) if page and page.isdigit() else None
+
+
+def get_per_page_url(url: str) -> str:
+    """
+    Returns the given URL requesting 100 results per page, unless it sets per_page already.
+
+    Parameters:
+        url (str): A URL of a paginated GitHub API result.
+
+    Returns:
+        str: The URL with the per_page query parameter.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.setdefault("per_page", "100")
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def iter_remaining_pages(next_url, last_url, session):
+    """
+    Fetches the pages from next_url up to last_url in parallel.
+
+    Works for page numbered pagination only, where the page parameter of the
+    "last" link tells the number of pages upfront.
+
+    Parameters:
+        next_url (str): The URL of the next page as given by the "next" link.
+        last_url (str): The URL of the last page as given by the "last" link.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        Iterator: The status code and the data of each page in page order, up to the first failed page.
+    """
+    first_page = get_page_number(next_url)
+    last_page = get_page_number(last_url)
+    page_urls = [get_page_url(last_url, page) for page in range(first_page, last_page + 1)]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, len(page_urls))) as executor:
+        responses = executor.map(lambda page_url: request_json(page_url, session), page_urls)
+        for status_code, data, links in responses:
+            yield status_code, data
+            if status_code != 200:
+                break
+
+
+def iter_pages(url, session):
+    """
+    Fetches the pages of paginated data from a given URL.
+
+    If the first response links the last page by page number, the remaining pages are
+    fetched in parallel, otherwise (cursor based pagination) the "next" links are followed.
 
     Parameters:
         url (str): The initial URL to fetch data from.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
-        list: A list of results obtained from the paginated API.
+        Iterator: The status code and the data of each page in page order, up to the first failed page.
     """
-    results = []
-    if "?per_page=100" not in url:
-        url += "?per_page=100"
+    url = get_per_page_url(url)
     while url:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            results.extend(response.json())
-            if 'next' in response.links:
-                url = response.links['next']['url']
-            else:
-                url = None
+        status_code, data, links = request_json(url, session)
+        yield status_code, data
+        if status_code != 200 or 'next' not in links:
+            url = None
+        elif 'last' in links and get_page_number(links['next']['url']) and get_page_number(links['last']['url']):
+            yield from iter_remaining_pages(links['next']['url'], links['last']['url'], session)
+            url = None
         else:
-            logging.error(f"Failed to fetch data: {response.status_code}")
+            url = links['next']['url']
+
+
+def iter_pagination(url, session):
+    """
+    Fetches paginated data from a given URL page by page.
+
+    Only the pages being fetched are held in memory, the results are yielded as soon as
+    their page arrives.
+
+    Parameters:
+        url (str): The initial URL to fetch data from.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        Iterator: The results obtained from the paginated API.
+    """
+    for status_code, data in iter_pages(url, session):
+        if status_code != 200:
+            logging.error(f"Failed to fetch data: {status_code}")
             break
+        yield from data
 
-    return results
 
+def request_pagination_with_status(url, session) -> tuple:
+    """
+    Fetches paginated data from a given URL, along with the status of the first page.
 
-def get_organization_dependabot_alerts_gh(headers) -> list:
+    Parameters:
+        url (str): The initial URL to fetch data from.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        tuple: The status code of the first page and a list of results obtained from the paginated API.
+    """
+    results = []
+    first_status_code = None
+    for status_code, data in iter_pages(url, session):
+        if first_status_code is None:
+            first_status_code = status_code
+        if status_code == 200:
+            results.extend(data)
+        elif status_code != first_status_code:
+            logging.error(f"Failed to fetch data: {status_code}")
+
+    return first_status_code, results
+
+
+def request_pagination(url, session) -> list:
+    """
+    Fetches paginated data from a given URL.
+
+    Parameters:
+        url (str): The initial URL to fetch data from.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        list: A list of results obtained from the paginated API.
+    """
+    return list(iter_pagination(url, session))
+
+
+def get_organization_dependabot_alerts_gh(org: str, session):
     """
     Fetches Dependabot alerts for the organization from GitHub.
 
     Parameters:
-        headers (dict): The headers to include in the request.
+        org (str): The name of the GitHub organization.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
-        list: A list of Dependabot alerts obtained from the GitHub API.
+        Iterator: The Dependabot alerts obtained from the GitHub API, fetched while iterating.
     """
-    url = f"https://api.github.com/orgs/moia-dev/dependabot/alerts"
-    results = request_pagination(url, headers)
-    return results
+    url = f"{GH_API_URL}/orgs/{org}/dependabot/alerts"
+    return iter_pagination(url, session)
 
 
-def get_repository_sbom(repo, headers) -> dict:
+def get_repository_sbom(repo, session) -> dict:
     """
     Fetches the Software Bill of Materials (SBOM) for a given repository from GitHub.
 
     Parameters:
         repo (dict): A dictionary containing repository information.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
         dict: A dictionary containing the SBOM data for the repository.
     """
+    if repo.get("size") == 0:
+        return []  # an empty repository has no dependency graph
 
     url = f"{repo['url']}/dependency-graph/sbom"
-    result = request_pagination(url, headers)
+    result = request_pagination(url, session)
     return result
 
 
-def get_repository_languages(repo, headers) -> dict:
+def get_repository_languages(repo, session) -> dict:
     """
     Fetches the Software Bill of Materials (SBOM) for a given repository from GitHub.
 
     Parameters:
         repo (dict): A dictionary containing repository information.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
         dict: A dictionary containing the SBOM data for the repository.
     """
+    if repo.get("size") == 0:
+        return []  # an empty repository has no languages
 
     url = f"{repo['languages_url']}"
-    result = request_pagination(url, headers)
+    result = request_pagination(url, session)
     return result
 
 
-def repositories_list_gh(headers) -> list:
+def repositories_list_gh(org: str, session) -> list:
     """
     Fetches a list of repositories from the GitHub organization.
 
     Parameters:
-        headers (dict): The headers to include in the request.
+        org (str): The name of the GitHub organization.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
         list: A list of repositories obtained from the GitHub API.
     """
-    url = f"https://api.github.com/orgs/moia-dev/repos"
-    results = request_pagination(url, headers)
+    url = f"{GH_API_URL}/orgs/{org}/repos"
+    results = request_pagination(url, session)
     return results
 
 
-def get_repository_list(args: dict, headers: dict) -> dict:
+def get_repository_list(args: dict, session: requests.Session) -> dict:
     """
     Fetches a list of repositories based on the action specified in args.
     Load from GH or local
 
     Parameters:
         args (dict): A dictionary containing the action and other parameters.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
         dict: A dictionary of repositories.
@@ -145,57 +528,188 @@ def get_repository_list(args: dict, headers: dict) -> dict:
     repos = {}
     if args.action in ["full", "list-repos"]:
         logging.info(f"load repos from GitHub")
-        repos = repositories_list_gh(headers)
+        repos = repositories_list_gh(args.org, session)
 
     elif args.action == "check-repofile":
         logging.info(f"load repos from localfile: {args.input_file_repos}")
-        with open(args.input_file_repos, 'r') as f:
-            repos = json.load(f)
+        with open(args.input_file_repos, 'rb') as f:
+            repos = load_json_bytes(f.read())
     else:
         pass
 
     return repos
 
 
-def check_repository_dependabot_enabled_gh(repo, headers) -> bool:
+def get_repository_dependabot_alerts_gh(repo: dict, session: requests.Session) -> list:
     """
-    Checks if the dependabot alerts are enabled for a given repository from GitHub.
+    Fetches the dependabot alerts for a given repository from GitHub.
 
     Parameters:
         repo (dict): A dictionary containing repository information.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
-        bool: True if the dependabot alerts are enabled (code 204), False otherwise.
+        list: A list of dependabot alerts, or None if the dependabot alerts are disabled (code 403 or 404).
     """
-    url = f"{repo['url']}/vulnerability-alerts"
-    response = requests.get(url, headers=headers)
-    return response.status_code == 204
+    url = f"{repo['url']}/dependabot/alerts"
+    status_code, result = request_pagination_with_status(url, session)
+    if status_code in (403, 404):
+        return None
+    if status_code != 200:
+        logging.error(f"Failed to fetch data: {status_code}")
+    return result
 
 
-def get_repository_dependabot_alerts_gh(repo: dict, headers: dict) -> list:
+def get_repository_record_gh(repo, session) -> dict:
     """
-    Fetches the dependabot alerts for a given repository from GitHub.
+    Fetches the dependabot status, dependabot alerts and languages of a single repository.
 
     Parameters:
         repo (dict): A dictionary containing repository information.
-        headers (dict): The headers to include in the request.
+        session (requests.Session): The session to send the requests with.
 
     Returns:
-        list: A list of dependabot alerts.
+        dict: The repository record extended by dependabot_enabled, dependabot_alerts and languages.
     """
-    url = f"{repo['url']}/dependabot/alerts"
-    result = request_pagination(url, headers)
-    return result
+    repo_record = repo
+
+    # the requests are independent, fetch the languages while the alerts are fetched
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        languages = executor.submit(get_repository_languages, repo, session)
+        dependabot_alerts = get_repository_dependabot_alerts_gh(repo, session)
+        repo_record["dependabot_enabled"] = dependabot_alerts is not None
+        repo_record["dependabot_alerts"] = dependabot_alerts or []
+        repo_record["languages"] = languages.result()
+
+    return repo_record
 
 
-def get_repository_data_gh(args, headers, repos) -> dict:
+def get_archived_repository_record(repo: dict) -> dict:
+    """
+    Creates the record of an archived repository without any request.
+
+    Parameters:
+        repo (dict): A dictionary containing repository information.
+
+    Returns:
+        dict: The repository record with dependabot disabled, no alerts and no languages.
+    """
+    repo_record = repo
+    repo_record["dependabot_enabled"] = False
+    repo_record["dependabot_alerts"] = []
+    repo_record["languages"] = []
+    return repo_record
+
+
+def get_rest_alert_from_graphql(alert: dict, repo: dict) -> dict:
+    """
+    Converts a GraphQL RepositoryVulnerabilityAlert into the shape of a REST dependabot alert.
+
+    Only the fields used by the analysis are converted. GraphQL has no updated_at,
+    the time of fixing or dismissing is used instead.
+
+    Parameters:
+        alert (dict): The GraphQL alert node.
+        repo (dict): The repository the alert belongs to.
+
+    Returns:
+        dict: The alert in the shape of the REST API.
+    """
+    vulnerability = alert["securityVulnerability"]
+    severity = vulnerability["severity"]
+    scope = alert["dependencyScope"]
+
+    return {
+        "number": alert["number"],
+        "state": alert["state"].lower(),
+        "created_at": alert["createdAt"],
+        "updated_at": alert["fixedAt"] or alert["dismissedAt"] or alert["autoDismissedAt"] or alert["createdAt"],
+        "url": f"{repo['url']}/dependabot/alerts/{alert['number']}",
+        "dependency": {
+            "package": {
+                "name": vulnerability["package"]["name"],
+                "ecosystem": vulnerability["package"]["ecosystem"].lower(),
+            },
+            "scope": scope.lower() if scope else None,
+        },
+        "security_advisory": {"ghsa_id": alert["securityAdvisory"]["ghsaId"]},
+        "security_vulnerability": {"severity": GRAPHQL_SEVERITIES.get(severity, severity.lower())},
+    }
+
+
+def fetch_repo_bundle_graphql(repos, session) -> list:
+    """
+    Fetches dependabot status, dependabot alerts and languages of several repositories with one GraphQL request.
+
+    Repositories the request cannot resolve are fetched with the REST API instead, as are
+    the alerts of repositories with more alerts than fit into a single GraphQL page.
+
+    Parameters:
+        repos (list): Up to GRAPHQL_BATCH_SIZE repositories.
+        session (requests.Session): The session to send the requests with.
+
+    Returns:
+        list: The repository records in the order of repos, see get_repository_record_gh.
+    """
+    variables = {}
+    declarations = []
+    selections = []
+    for index, repo in enumerate(repos):
+        owner, name = repo["full_name"].split("/", 1)
+        variables[f"owner{index}"] = owner
+        variables[f"name{index}"] = name
+        declarations.append(f"$owner{index}: String!, $name{index}: String!")
+        selections.append(f"repo{index}: repository(owner: $owner{index}, name: $name{index}) {{ ...RepoBundle }}")
+
+    query = f"query({', '.join(declarations)}) {{ {' '.join(selections)} }} {GRAPHQL_REPO_BUNDLE_FRAGMENT}"
+    response = session.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+
+    bundles = {}
+    if response.status_code == 200:
+        bundles = load_json_bytes(response.content).get("data") or {}
+    else:
+        logging.error(f"Failed to fetch data: {response.status_code}")
+
+    repo_records = []
+    for index, repo in enumerate(repos):
+        bundle = bundles.get(f"repo{index}")
+        # the fields are null with a partial data error, e.g. without the alerts permission
+        if bundle is None or bundle["vulnerabilityAlerts"] is None or bundle["languages"] is None:
+            repo_records.append(get_repository_record_gh(repo, session))
+            continue
+
+        repo_record = repo
+        repo_record["dependabot_enabled"] = bundle["hasVulnerabilityAlertsEnabled"]
+
+        alerts = bundle["vulnerabilityAlerts"]
+        if not repo_record["dependabot_enabled"]:
+            repo_record["dependabot_alerts"] = []
+        elif alerts["pageInfo"]["hasNextPage"]:
+            repo_record["dependabot_alerts"] = get_repository_dependabot_alerts_gh(repo, session) or []
+        else:
+            repo_record["dependabot_alerts"] = [get_rest_alert_from_graphql(alert, repo) for alert in alerts["nodes"]]
+
+        repo_record["languages"] = [language["name"] for language in bundle["languages"]["nodes"]]
+
+        repo_records.append(repo_record)
+
+    return repo_records
+
+
+def get_repository_data_gh(args, session, repos) -> dict:
     """
     Processes repository data and checks for dependabot status.
 
+    The repositories are processed concurrently by args.max_workers threads, the number
+    of parallel requests against the GitHub API is bounded by the session, see
+    make_session. With args.graphql
+    batches of GRAPHQL_BATCH_SIZE repositories are fetched with one GraphQL request each.
+    Every record is appended to REPO_RECORDS_FILE by a BackgroundWriter as soon as it is complete.
+    Archived repositories are not fetched unless args.include_archived.
+
     Parameters:
         args (argparse.Namespace): The parsed command-line arguments.
-        headers (dict): The headers for GitHub API requests.
+        session (requests.Session): The session to send the requests with.
         repos (list): A list of repositories to process.
 
     Returns:
@@ -204,76 +718,222 @@ def get_repository_data_gh(args, headers, repos) -> dict:
     logging.info(f"Number of Repositories: {len(repos)}")
     dep_yes = 0
     dep_no = 0
-    rep_no = 0 
-
-    repository_data = {}
-    for repo in repos:
-        rep_no += 1
-
-        # check repos - disabled, archived
 
-        repo_identifier = repo["full_name"]
-        repo_record = repo
+    if args.include_archived:
+        fetch_repos = repos
+    else:
+        fetch_repos = [repo for repo in repos if not repo.get("archived")]
+        logging.info(f"Skip {len(repos) - len(fetch_repos)} archived repositories")
 
-        logMsg = f"{rep_no}. {repo['full_name']}"
-        if check_repository_dependabot_enabled_gh(repo, headers):
-            dep_yes += 1
-            repo_record["dependabot_enabled"] = True
-            alerts = get_repository_dependabot_alerts_gh(repo, headers)
-            repo_record["dependabot_alerts"] = alerts
-            logMsg += " has dependabot enabled and {len(alerts)} alerts"
+    repository_data = {}
+    with BackgroundWriter(REPO_RECORDS_FILE) as records_writer, ThreadPoolExecutor(max_workers=args.max_workers) as executor:
+        if args.graphql:
+            batches = [fetch_repos[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(fetch_repos), GRAPHQL_BATCH_SIZE)]
+            fetched_records = chain.from_iterable(executor.map(lambda batch: fetch_repo_bundle_graphql(batch, session), batches))
+        else:
+            fetched_records = executor.map(lambda repo: get_repository_record_gh(repo, session), fetch_repos)
 
+        if args.include_archived:
+            repo_records = fetched_records
         else:
-            dep_no += 1
-            repo_record["dependabot_enabled"] = False
-            repo_record["dependabot_alerts"] = []
-            logMsg += " has dependabot disabled"
+            repo_records = (get_archived_repository_record(repo) if repo.get("archived") else next(fetched_records) for repo in repos)
 
-        write_json_to_file(repo_record, f"{repo_identifier}.json")
+        # map yields in the order of repos, so the result keeps the order of the input
+        for rep_no, repo_record in enumerate(repo_records, start=1):
+            repo_identifier = repo_record["full_name"]
 
-        languages_data = get_repository_languages(repo, headers)        
-        repo_record["languages"] = languages_data
-        write_json_to_file(languages_data, f"{repo_identifier}_languages.json")
+            logMsg = f"{rep_no}. {repo_identifier}"
+            if repo_record["dependabot_enabled"]:
+                dep_yes += 1
+                logMsg += f" has dependabot enabled and {len(repo_record['dependabot_alerts'])} alerts"
+            else:
+                dep_no += 1
+                logMsg += " has dependabot disabled"
 
-        repository_data[repo_identifier] = repo_record
-        logging.info(logMsg)  # Log an info message
+            records_writer.write(repo_record)
+            repository_data[repo_identifier] = repo_record
+            logging.info(logMsg)  # Log an info message
 
     logging.info(f"{dep_yes}/{len(repos)} have dependabot activated, should be {dep_no} repos without")
 
     return repository_data
 
 
+class TokenPool:
+    """
+    Hands out the request headers of several GitHub tokens in turn.
+
+    Every token has its own primary rate limit, rotating through the tokens multiplies
+    the number of requests per hour. A token reported as exhausted by a response with
+    X-RateLimit-Remaining 0 is skipped until its X-RateLimit-Reset time, if all tokens
+    are exhausted next_headers waits for the first one to reset.
+    """
+
+    def __init__(self, headers_list: list):
+        self.headers_list = headers_list
+        self.reset_times = [0.0] * len(headers_list)
+        self.index = 0
+        self.lock = threading.Lock()
+
+    def next_headers(self) -> dict:
+        """
+        Returns the headers of the next token which is not rate limited.
+
+        Returns:
+            dict: The headers to send the request with.
+        """
+        with self.lock:
+            token_count = len(self.headers_list)
+            now = time.time()
+            for offset in range(token_count):
+                index = (self.index + offset) % token_count
+                if self.reset_times[index] <= now:
+                    self.index = index + 1
+                    return self.headers_list[index]
+            index = min(range(token_count), key=self.reset_times.__getitem__)
+            wait_time = self.reset_times[index] - now
+            self.index = index + 1
+        logging.warning(f"All {token_count} tokens are rate limited, wait {wait_time:.0f} seconds")
+        time.sleep(wait_time)
+        return self.headers_list[index]
+
+    def update(self, headers: dict, response: requests.Response) -> None:
+        """
+        Marks the token of the headers as exhausted if the response says so.
+
+        Parameters:
+            headers (dict): The headers the request was sent with.
+            response (requests.Response): The response to the request.
+        """
+        if response.headers.get("X-RateLimit-Remaining") != "0":
+            return
+        reset_time = float(response.headers.get("X-RateLimit-Reset", time.time() + 60)) + 1
+        with self.lock:
+            for index, pool_headers in enumerate(self.headers_list):
+                if pool_headers is headers:
+                    self.reset_times[index] = reset_time
+        logging.warning(f"Token rate limited until {datetime.fromtimestamp(reset_time)}")
+
+
+def get_rate_limit_wait(response: requests.Response, attempt: int):
+    """
+    Determines how long to wait before retrying a rate limited request.
+
+    Parameters:
+        response (requests.Response): The response to the request.
+        attempt (int): The number of retries of the request so far.
+
+    Returns:
+        float: The seconds to wait before the retry, or None if the request was not rate limited.
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        # the token pool waits until the token, or another one, can be used again
+        return 0
+    if response.status_code == 403 and "secondary rate limit" not in response.text:
+        # a regular permission error, e.g. dependabot alerts are disabled
+        return None
+    return min(60, 2 ** attempt) + random.random()
+
+
+class TokenPoolSession(requests.Session):
+    """
+    A session sending every request with the headers of the next token of a TokenPool.
+
+    Rate limited requests, 429 or 403 because of the primary or the secondary rate limit,
+    are retried after Retry-After, the rate limit reset or an exponential backoff. At most
+    max_requests requests are in flight at once, across all threads using the session.
+    """
+
+    def __init__(self, token_pool: TokenPool, max_requests: int):
+        super().__init__()
+        self.token_pool = token_pool
+        self.request_slots = threading.BoundedSemaphore(max_requests)
+
+    def request(self, method, url, headers=None, **kwargs):
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            token_headers = self.token_pool.next_headers()
+            with self.request_slots:
+                response = super().request(method, url, headers={**token_headers, **(headers or {})}, **kwargs)
+            self.token_pool.update(token_headers, response)
+            wait_time = get_rate_limit_wait(response, attempt)
+            if wait_time is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            logging.warning(f"Rate limited with {response.status_code} on {url}, retry in {wait_time:.1f} seconds")
+            time.sleep(wait_time)
+
+
+def make_session(headers_list: list, max_requests: int = 20) -> requests.Session:
+    """
+    Creates the session used for all GitHub API requests.
+
+    The session keeps connections to the API alive and reuses them across requests and
+    threads, instead of a new TCP and TLS handshake per request. Requests failing with a
+    server error are retried with backoff, after the last retry the failed response is
+    returned instead of raised. Rate limited requests are retried by the
+    TokenPoolSession. The requests rotate through the tokens of all given headers, see
+    TokenPool.
+
+    The repository, page and languages threads all share the session, so it bounds the
+    number of parallel requests against the GitHub API and keeps one pooled connection
+    per request slot.
+
+    Parameters:
+        headers_list (list): The headers of every token, see get_tokenized_header.
+        max_requests (int): The maximum number of requests in flight at once.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = TokenPoolSession(TokenPool(headers_list or [{}]), max_requests)
+
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=max_requests, max_retries=retry))
+    return session
+
+
 def get_tokenized_header(args):
     """
-    Retrieves a tokenized header for GitHub API requests.
+    Retrieves the tokenized headers for GitHub API requests.
 
     Args:
-        args (argparse.Namespace): The arguments containing item_name and item_field for vault.
+        args (argparse.Namespace): The arguments containing item_names and item_field for vault.
 
     Returns:
-        dict: A dictionary containing the headers for GitHub API requests, or None if token retrieval failed.
+        list: A list of dictionaries containing the headers for GitHub API requests, one per token, or None if token retrieval failed.
     """
     
-    item_name_vault = args.item_name_vault
+    item_names_vault = (args.item_names_vault or args.item_name_vault).split(",")
     item_field_vault = args.item_field_vault
 
-    token = get_token_from_1password(item_name_vault, item_field_vault)
-    if not token:
-        logging.error(f"no token found for auth")
-        return None
-    
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {token}",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
+    headers_list = []
+    for item_name_vault in item_names_vault:
+        token = get_token_from_1password(item_name_vault.strip(), item_field_vault)
+        if not token:
+            logging.error(f"no token found for auth")
+            return None
 
-    return headers
+        headers_list.append({
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+            "X-GitHub-Api-Version": "2022-11-28"
+        })
 
+    logging.info(f"Use {len(headers_list)} tokens")
+    return headers_list
+
+@lru_cache(maxsize=16)
 def get_token_from_1password(item_name: str, field_name: str) -> str:
     """
     Retrieves a token from 1Password.
 
+    Every op call starts a process which talks to 1Password, so the token is cached
+    per item and field for the lifetime of the process.
+
     Parameters:
         item_name (str): The name of the item in 1Password.
         field_name (str): The name of the field in the item to retrieve.
@@ -282,7 +942,7 @@ def get_token_from_1password(item_name: str, field_name: str) -> str:
         str: The token retrieved from 1Password, or None if retrieval failed.
     """
     result = subprocess.run(
-        ["op", "read", "op://mhammer.pro/GH-PRJ01_gh-depbot-report_finegrain/credential"],
+        ["op", "read", f"op://mhammer.pro/{item_name}/{field_name}"],
         capture_output=True,
         text=True
     )
@@ -305,9 +965,15 @@ def arg_parse() -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(description="Work with GitHub repositories")
     parser.add_argument('--action', type=str, default="full", help='Action to execute', choices=['full', 'repos', 'repos-alerts', 'org-alerts'])
+    parser.add_argument('--org', type=str, default="moia-dev", help='The GitHub organization to fetch the repositories and dependabot alerts of')
     parser.add_argument('--item_name_vault', type=str, default="GH-PRJ01_gh-depbot-report_finegrain", help='The name of the Vault item containing the GitHub token')
+    parser.add_argument('--item_names_vault', type=str, default=None, help='Comma separated names of Vault items containing GitHub tokens, the requests rotate through all tokens')
     parser.add_argument('--item_field_vault', type=str, default="credential", help='The field name in the Vault item containing the GitHub token')
     parser.add_argument('--output_file_prefix', type=str, default="repos.json", help='The base name of the output JSON file for all repositories')
+    parser.add_argument('--max_workers', type=int, default=20, help='The number of repositories fetched concurrently, also the maximum number of parallel API requests')
+    parser.add_argument('--cache_dir', type=str, default=CACHE_DIR, help='The directory of the ETag cache of API responses, empty to disable it')
+    parser.add_argument('--include_archived', action='store_true', help='Fetch dependabot alerts and languages of archived repositories too, otherwise they are recorded with dependabot disabled and no alerts, which shows in the CompareOrgVsRepo sheet of the report')
+    parser.add_argument('--graphql', action='store_true', help='Fetch dependabot alerts and languages with batched GraphQL requests instead of per repository REST requests')
  
     args = parser.parse_args()
     return args
@@ -322,17 +988,21 @@ def main():
     args = arg_parse()
     action = args.action
 
-    headers = get_tokenized_header(args)
+    global CACHE_DIR
+    CACHE_DIR = args.cache_dir
+
+    headers_list = get_tokenized_header(args)
+    session = make_session(headers_list, args.max_workers)
 
-    org_dep_alerts = get_organization_dependabot_alerts_gh(headers)
-    logging.info(f"Write {len(org_dep_alerts)} dependabot alerts")
-    write_json_to_file(org_dep_alerts, "gh_org_dep_alerts.json")
+    org_dep_alerts = get_organization_dependabot_alerts_gh(args.org, session)
+    alert_count = write_json_items_to_file(org_dep_alerts, "gh_org_dep_alerts.json")
+    logging.info(f"Wrote {alert_count} dependabot alerts")
 
-    repos = get_repository_list(args, headers)
+    repos = get_repository_list(args, session)
     logging.info(f"Write {len(repos)} repos")
     write_json_to_file(repos, "gh_repo_list.json")
 
-    repos_data = get_repository_data_gh(args, headers, repos)
+    repos_data = get_repository_data_gh(args, session, repos)
     logging.info(f"Write {len(repos_data)} repos data")
     write_json_to_file(repos_data, "gh_repo_data.json")
 